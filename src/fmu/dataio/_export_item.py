@@ -1,4 +1,5 @@
 """Private module for Surface IO in DataIO class."""
+import io
 import json
 import logging
 import warnings
@@ -83,6 +84,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             self.verbosity = self.dataio._verbosity
 
         logger.setLevel(level=self.verbosity)
+        _utils.logger.setLevel(level=self.verbosity)
 
         if self.dataio._name is not None:
             self.name = self.dataio._name
@@ -693,7 +695,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
 
     def _item_to_file(self):
         logger.info("Export item to file...")
-        logger.debug(f"subtype is {self.subtype}")
+        logger.debug("subtype is %s", self.subtype)
         if self.subtype == "RegularSurface":
             fpath = self._item_to_file_regularsurface()
         elif self.subtype == "RegularCube":
@@ -706,27 +708,28 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             fpath = self._item_to_file_dataframe()
         return fpath
 
-    def _item_to_file_regularsurface(self):
-        """Write RegularSurface to file"""
-        logger.info("Export %s to file...", self.subtype)
-        dataio = self.dataio  # shorter
-        obj = self.obj
-
-        if isinstance(dataio._tagname, str):
-            attr = dataio._tagname.lower().replace(" ", "_")
-        else:
-            attr = None
+    def _build_paths(self, loc, ext, pretagname=None):
+        """Return paths to data file and metadata file, see _utils.build_paths()."""
+        dataio = self.dataio
+        tagname = dataio._tagname if isinstance(dataio._tagname, str) else None
 
-        fname, fpath = _utils.construct_filename(
+        return _utils.build_paths(
+            dataio,
             self.name,
-            pretagname=None,
-            tagname=attr,
+            ext,
+            pretagname=pretagname,
+            tagname=tagname,
             subfolder=self.subfolder,
-            loc="surface",
+            loc=loc,
             outroot=dataio.export_root,
-            verbosity=dataio._verbosity,
         )
 
+    def _item_to_file_regularsurface(self):
+        """Write RegularSurface to file"""
+        logger.info("Export %s to file...", self.subtype)
+        dataio = self.dataio  # shorter
+        obj = self.obj
+
         fmt = dataio.surface_fformat
 
         if fmt not in VALID_SURFACE_FORMATS.keys():
@@ -736,9 +739,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             )
 
         ext = VALID_SURFACE_FORMATS.get(fmt, ".irap_binary")
-        outfile, metafile, relpath, abspath = _utils.verify_path(
-            dataio, fpath, fname, ext
-        )
+        outfile, metafile, relpath, abspath = self._build_paths("surface", ext)
 
         logger.info("Exported file is %s", outfile)
         if "irap" in fmt:
@@ -746,9 +747,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             self.dataio._meta_data["format"] = "irap_binary"
             self._item_to_file_create_file_block(outfile, relpath, abspath)
             allmeta = self._item_to_file_collect_all_metadata()
-            _utils.export_metadata_file(
-                metafile, allmeta, verbosity=self.verbosity, savefmt=dataio.meta_format
-            )
+            self._item_to_file_export_metadata(metafile, allmeta)
 
         else:
             raise TypeError("Format ... is not implemened")
@@ -761,21 +760,6 @@ class _ExportItem:  # pylint disable=too-few-public-methods
         dataio = self.dataio  # shorter
         obj = self.obj
 
-        if isinstance(dataio._tagname, str):
-            attr = dataio._tagname.lower().replace(" ", "_")
-        else:
-            attr = None
-
-        fname, fpath = _utils.construct_filename(
-            self.name,
-            pretagname=None,
-            tagname=attr,
-            subfolder=self.subfolder,
-            loc="cube",
-            outroot=dataio.export_root,
-            verbosity=dataio._verbosity,
-        )
-
         fmt = dataio.cube_fformat
 
         if fmt not in VALID_CUBE_FORMATS.keys():
@@ -785,9 +769,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             )
 
         ext = VALID_CUBE_FORMATS.get(fmt, ".irap_binary")
-        outfile, metafile, relpath, abspath = _utils.verify_path(
-            dataio, fpath, fname, ext
-        )
+        outfile, metafile, relpath, abspath = self._build_paths("cube", ext)
 
         logger.info("Exported file is %s", outfile)
         if "segy" in fmt:
@@ -795,9 +777,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             self.dataio._meta_data["format"] = "segy"
             self._item_to_file_create_file_block(outfile, relpath, abspath)
             allmeta = self._item_to_file_collect_all_metadata()
-            _utils.export_metadata_file(
-                metafile, allmeta, verbosity=self.verbosity, savefmt=dataio.meta_format
-            )
+            self._item_to_file_export_metadata(metafile, allmeta)
 
         else:
             raise TypeError(f"Format <{fmt}> is not implemened")
@@ -810,21 +790,6 @@ class _ExportItem:  # pylint disable=too-few-public-methods
         dataio = self.dataio  # shorter
         obj = self.obj
 
-        if isinstance(dataio._tagname, str):
-            attr = dataio._tagname.lower().replace(" ", "_")
-        else:
-            attr = None
-
-        fname, fpath = _utils.construct_filename(
-            self.name,
-            pretagname=self.parent_name,
-            tagname=attr,
-            subfolder=self.subfolder,
-            loc="grid",
-            outroot=dataio.export_root,
-            verbosity=dataio._verbosity,
-        )
-
         fmt = dataio.grid_fformat
 
         if fmt not in VALID_GRID_FORMATS.keys():
@@ -834,8 +799,8 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             )
 
         ext = VALID_GRID_FORMATS.get(fmt, ".hdf")
-        outfile, metafile, relpath, abspath = _utils.verify_path(
-            dataio, fpath, fname, ext
+        outfile, metafile, relpath, abspath = self._build_paths(
+            "grid", ext, pretagname=self.parent_name
         )
 
         logger.info("Exported file is %s", outfile)
@@ -844,9 +809,7 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             self.dataio._meta_data["format"] = "roff"
             self._item_to_file_create_file_block(outfile, relpath, abspath)
             allmeta = self._item_to_file_collect_all_metadata()
-            _utils.export_metadata_file(
-                metafile, allmeta, verbosity=self.verbosity, savefmt=dataio.meta_format
-            )
+            self._item_to_file_export_metadata(metafile, allmeta)
         else:
             raise TypeError("Format ... is not implemened")
 
@@ -858,21 +821,6 @@ class _ExportItem:  # pylint disable=too-few-public-methods
         dataio = self.dataio  # shorter
         obj = self.obj
 
-        if isinstance(dataio._tagname, str):
-            attr = dataio._tagname.lower().replace(" ", "_")
-        else:
-            attr = None
-
-        fname, fpath = _utils.construct_filename(
-            self.name,
-            pretagname=None,
-            tagname=attr,
-            subfolder=self.subfolder,
-            loc="polygons",
-            outroot=dataio.export_root,
-            verbosity=dataio._verbosity,
-        )
-
         fmt = dataio.polygons_fformat
 
         if fmt not in VALID_POLYGONS_FORMATS.keys():
@@ -883,30 +831,32 @@ class _ExportItem:  # pylint disable=too-few-public-methods
 
         ext = VALID_POLYGONS_FORMATS.get(fmt, ".hdf")
 
-        outfile, metafile, relpath, abspath = _utils.verify_path(
-            dataio, fpath, fname, ext
-        )
+        outfile, metafile, relpath, abspath = self._build_paths("polygons", ext)
 
         logger.info("Exported file is %s", outfile)
         if "csv" in fmt:
             renamings = {"X_UTME": "X", "Y_UTMN": "Y", "Z_TVDSS": "Z", "POLY_ID": "ID"}
             worker = obj.dataframe.copy()
             worker.rename(columns=renamings, inplace=True)
-            worker.to_csv(outfile, index=False)
+            writer = _utils.HashingWriter(outfile)
+            with io.TextIOWrapper(writer, encoding="utf-8", newline="") as stream:
+                worker.to_csv(stream, index=False)
             self.dataio._meta_data["format"] = "csv"
-            self._item_to_file_create_file_block(outfile, relpath, abspath)
-            allmeta = self._item_to_file_collect_all_metadata()
-            _utils.export_metadata_file(
-                metafile, allmeta, verbosity=self.verbosity, savefmt=dataio.meta_format
+            self._item_to_file_create_file_block(
+                outfile,
+                relpath,
+                abspath,
+                md5sum=writer.hexdigest(),
+                size_bytes=writer.size_bytes,
             )
+            allmeta = self._item_to_file_collect_all_metadata()
+            self._item_to_file_export_metadata(metafile, allmeta)
         elif "irap_ascii" in fmt:
             obj.to_file(outfile)
             self.dataio._meta_data["format"] = "irap_ascii"
             self._item_to_file_create_file_block(outfile, relpath, abspath)
             allmeta = self._item_to_file_collect_all_metadata()
-            _utils.export_metadata_file(
-                metafile, allmeta, verbosity=self.verbosity, savefmt=dataio.meta_format
-            )
+            self._item_to_file_export_metadata(metafile, allmeta)
         else:
             raise TypeError("Format is not supported")
 
@@ -917,21 +867,6 @@ class _ExportItem:  # pylint disable=too-few-public-methods
         dataio = self.dataio  # shorter
         obj = self.obj
 
-        if isinstance(dataio._tagname, str):
-            attr = dataio._tagname.lower().replace(" ", "_")
-        else:
-            attr = None
-
-        fname, fpath = _utils.construct_filename(
-            self.name,
-            pretagname=None,
-            tagname=attr,
-            subfolder=self.subfolder,
-            loc="table",
-            outroot=dataio.export_root,
-            verbosity=dataio._verbosity,
-        )
-
         fmt = dataio.table_fformat
 
         if fmt not in VALID_TABLE_FORMATS.keys():
@@ -941,19 +876,23 @@ class _ExportItem:  # pylint disable=too-few-public-methods
             )
 
         ext = VALID_TABLE_FORMATS.get(fmt, ".hdf")
-        outfile, metafile, relpath, abspath = _utils.verify_path(
-            dataio, fpath, fname, ext
-        )
+        outfile, metafile, relpath, abspath = self._build_paths("table", ext)
 
         logger.info("Exported file is %s", outfile)
         if "csv" in dataio.table_fformat:
-            obj.to_csv(outfile, index=self.index_df)
+            writer = _utils.HashingWriter(outfile)
+            with io.TextIOWrapper(writer, encoding="utf-8", newline="") as stream:
+                obj.to_csv(stream, index=self.index_df)
             self.dataio._meta_data["format"] = "csv"
-            self._item_to_file_create_file_block(outfile, relpath, abspath)
-            allmeta = self._item_to_file_collect_all_metadata()
-            _utils.export_metadata_file(
-                metafile, allmeta, verbosity=self.verbosity, savefmt=dataio.meta_format
+            self._item_to_file_create_file_block(
+                outfile,
+                relpath,
+                abspath,
+                md5sum=writer.hexdigest(),
+                size_bytes=writer.size_bytes,
             )
+            allmeta = self._item_to_file_collect_all_metadata()
+            self._item_to_file_export_metadata(metafile, allmeta)
         else:
             raise TypeError("Other formats not supported yet for tables!")
 
@@ -977,12 +916,32 @@ class _ExportItem:  # pylint disable=too-few-public-methods
         allmeta["fmu"] = dataio._meta_fmu
         allmeta["data"] = dataio._meta_data
         allmeta["display"] = dataio._meta_display
-        logger.debug("\n%s", json.dumps(allmeta, indent=2, default=str))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n%s", json.dumps(allmeta, indent=2, default=str))
 
         logger.info("Collect all metadata, done")
         return allmeta
 
-    def _item_to_file_create_file_block(self, outfile, relpath, abspath):
+    def _item_to_file_export_metadata(self, metafile, allmeta):
+        """Export metadata to file, or collect them for the metadata archive."""
+        dataio = self.dataio
+        if dataio.metadata_archive:
+            if not dataio._metadata_archive_blocks:
+                warnings.warn(
+                    "Metadata are collected for the metadata_archive and are lost "
+                    "unless write_metadata_archive() is called after the exports",
+                    UserWarning,
+                )
+            fname, block = _utils.serialize_metadata(
+                metafile, allmeta, savefmt=dataio.meta_format
+            )
+            dataio._metadata_archive_blocks[fname] = block
+        else:
+            _utils.export_metadata_file(metafile, allmeta, savefmt=dataio.meta_format)
+
+    def _item_to_file_create_file_block(
+        self, outfile, relpath, abspath, md5sum=None, size_bytes=None
+    ):
         """Process the file block.
 
         The file block contains relative and absolute paths, file size
@@ -990,13 +949,15 @@ class _ExportItem:  # pylint disable=too-few-public-methods
         size and checksum, and populates the file block by inserting
         directly to the premade dataio._meta_file.
 
+        If the checksum and size were found while writing the file, they are given
+        as md5sum and size_bytes and the file is not read again.
         """
 
         self.dataio._meta_file["relative_path"] = str(relpath)
         self.dataio._meta_file["absolute_path"] = str(abspath)
 
-        md5sum = _utils.md5sum(outfile)
-        self.dataio._meta_file["checksum_md5"] = md5sum
+        if md5sum is None or size_bytes is None:
+            md5sum, size_bytes = _utils.md5sum_and_size(outfile)
 
-        size_bytes = _utils.size(outfile)
+        self.dataio._meta_file["checksum_md5"] = md5sum
         self.dataio._meta_file["size_bytes"] = size_bytes
@@ -31,6 +31,14 @@ pyyaml.add_representer(OrderedDict, map_representer, Dumper=SafeDumper)
 pyyaml.add_representer(dict, map_representer, Dumper=DangerDumper)
 pyyaml.add_representer(OrderedDict, map_representer, Dumper=DangerDumper)
 
+# The libyaml (C) based dumper/loader are much faster than the pure python ones, and
+# give the same result. Fall back to the python dumper/loader if PyYAML is built
+# without libyaml.
+FastSafeDumper = getattr(pyyaml, "CSafeDumper", SafeDumper)
+FastSafeLoader = getattr(pyyaml, "CSafeLoader", pyyaml.SafeLoader)
+pyyaml.add_representer(dict, map_representer, Dumper=FastSafeDumper)
+pyyaml.add_representer(OrderedDict, map_representer, Dumper=FastSafeDumper)
+
 
 if sys.version_info < (3, 7):
     pyyaml.add_constructor("tag:yaml.org,2002:map", map_constructor)
@@ -45,6 +53,7 @@ pyyaml.SafeDumper.yaml_representers[
     self,
     str(data),
 )
+FastSafeDumper.yaml_representers[None] = pyyaml.SafeDumper.yaml_representers[None]
 
 # Merge PyYAML namespace into ours.
 # This allows users a drop-in replacement:
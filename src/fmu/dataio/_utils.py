@@ -1,9 +1,16 @@
 """Module for private utilities/helpers for DataIO class."""
+import contextlib
+import copy
+import functools
 import hashlib
+import io
 import json
 import logging
+import os
+import re
+import sys
 import uuid
-from collections import OrderedDict
+import zipfile
 from os.path import join
 from pathlib import Path
 
@@ -11,6 +18,36 @@ from . import _oyaml as oyaml
 
 logger = logging.getLogger(__name__)
 
+# chunk size used when hashing files without hashlib.file_digest (Python < 3.11)
+MD5_CHUNKSIZE = 1024 * 1024
+
+# buffer size when writing (metadata) files, so they are written in one or few calls
+WRITE_BUFFERSIZE = 1024 * 1024
+
+# destination folder (below export root) per type of data; unknown goes to "other"
+LOC_TO_FOLDER = {
+    "surface": "maps",
+    "grid": "grids",
+    "table": "tables",
+    "polygons": "polygons",
+    "cube": "cubes",
+}
+
+# numbers as they may appear in e.g. parameters.txt, see check_if_number()
+# (digits may be grouped with single underscores, as accepted by int() and float())
+_FLOAT_START = frozenset("+-.iInN")  # in addition to digits
+_DIGITS = r"\d(?:_?\d)*"
+_INT_RE = re.compile(rf"[-+]?{_DIGITS}")
+_FLOAT_RE = re.compile(
+    rf"[-+]?(?:(?:{_DIGITS}\.?(?:{_DIGITS})?|\.{_DIGITS})(?:[eE][-+]?{_DIGITS})?"
+    r"|inf(?:inity)?|nan)",
+    re.IGNORECASE,
+)
+
+# columns in a line of parameters.txt are separated by whitespace or a colon, e.g.
+# "KEY VALUE" or "GROUP:KEY VALUE", see read_parameters_txt()
+_PARAMETER_SPLIT_RE = re.compile(r"\s+|:")
+
 
 def construct_filename(
     name,
@@ -22,7 +59,6 @@ def construct_filename(
     fmu=1,
     outroot="../../share/results/",
     loc="surface",
-    verbosity="WARNING",
 ):
     """Construct filename stem according to datatype (class) and fmu style.
 
@@ -62,42 +98,27 @@ def construct_filename(
 
     Returns stem for file name and destination
     """
-    logger.setLevel(level=verbosity)
-
     stem = "unset"
 
     outroot = Path(outroot)
 
     if fmu == 1:
 
-        stem = name.lower()
+        stem = _sanitize(name)
 
         if tagname:
-            stem += "--" + tagname.lower()
+            stem += "--" + _sanitize(tagname)
 
         if pretagname:
-            stem = pretagname.lower() + "--" + stem
+            stem = _sanitize(pretagname) + "--" + stem
 
         if t1 and not t2:
-            stem += "--" + str(t1).lower()
+            stem += "--" + _sanitize(str(t1))
 
         elif t1 and t2:
-            stem += "--" + str(t2).lower() + "_" + str(t1).lower()
-
-        stem = stem.replace(".", "_").replace(" ", "_")
-
-        if loc == "surface":
-            dest = outroot / "maps"
-        elif loc == "grid":
-            dest = outroot / "grids"
-        elif loc == "table":
-            dest = outroot / "tables"
-        elif loc == "polygons":
-            dest = outroot / "polygons"
-        elif loc == "cube":
-            dest = outroot / "cubes"
-        else:
-            dest = outroot / "other"
+            stem += "--" + _sanitize(str(t2)) + "_" + _sanitize(str(t1))
+
+        dest = outroot / LOC_TO_FOLDER.get(loc, "other")
 
         if subfolder:
             dest = dest / subfolder
@@ -105,41 +126,95 @@ def construct_filename(
     return stem, dest
 
 
+@functools.lru_cache(maxsize=512)
+def _sanitize(value: str) -> str:
+    """Return value lowercased and without dots and spaces, for file names.
+
+    Only a few distinct names and tags are used in an export job, hence the cache,
+    which also gives the same string object for the same value.
+    """
+    return value.lower().replace(".", "_").replace(" ", "_")
+
+
+def build_paths(
+    dataio,
+    name,
+    ext,
+    pretagname=None,
+    tagname=None,
+    t1=None,
+    t2=None,
+    subfolder=None,
+    loc="surface",
+    outroot="../../share/results/",
+    dryrun=False,
+):
+    """Construct file name and verify all paths for an object to export.
+
+    This does construct_filename() and verify_path() in one go (see those), where
+    the file name stem is made (lowercased and sanitized) only once.
+
+    Returns path, metapath, relpath and abspath, as verify_path()
+    """
+    stem, dest = construct_filename(
+        name,
+        pretagname=pretagname,
+        tagname=tagname,
+        t1=t1,
+        t2=t2,
+        subfolder=subfolder,
+        loc=loc,
+        outroot=outroot,
+    )
+    return _verify_path(dataio, dest, stem, ext, dryrun)
+
+
 def verify_path(dataio, filedest, filename, ext, dryrun=False):
-    logger.setLevel(level=dataio._verbosity)
+    """Verify (and create) the folder and return paths for filename, see build_paths.
+
+    Returns path, metapath, relpath and abspath
+    """
+    return _verify_path(dataio, filedest, filename.lower(), ext, dryrun)
 
+
+def _verify_path(dataio, filedest, filename, ext, dryrun):
+    """As verify_path(), but where filename is already lowercase."""
     logger.debug("Incoming filedest is %s", filedest)
     logger.debug("Incoming filename is %s", filename)
     logger.debug("Incoming ext is %s", ext)
 
     folder = dataio._pwd / filedest  # filedest shall be relative path to PWD
-
-    path = Path(folder) / filename.lower()
-    path = path.with_suffix(path.suffix + ext)
-    abspath = path.resolve()
-
+    path = folder / (filename + ext)
     logger.debug("path is %s", path)
 
+    # resolved folders are cached, to avoid resolving (symlinks etc.) the same folder
+    # again when exporting many objects to it
+    cachekey = (dataio._pwd, filedest)
+    resolved = dataio._folders.get(cachekey)
+    if resolved is None:
+        resolved = folder.resolve()
+        dataio._folders[cachekey] = resolved
+
     if not dryrun:
-        if path.parent.exists():
+        if resolved.exists():
             logger.info("Folder exists")
         else:
             if dataio.createfolder:
                 logger.info("No such folder, will create")
-                path.parent.mkdir(parents=True, exist_ok=True)
+                resolved.mkdir(parents=True, exist_ok=True)
             else:
-                raise IOError(f"Folder {str(path.parent)} is not present.")
+                raise IOError(f"Folder {str(folder)} is not present.")
+
+    abspath = resolved / (filename + ext)
 
     # create metafile path
-    metapath = (
-        (Path(folder) / ("." + filename.lower())).with_suffix(ext + ".yml")
-    ).resolve()
+    metapath = resolved / ("." + filename + ext + ".yml")
 
     # relative path
     relpath = str(filedest).replace("../", "")
     if dataio._realfolder is not None and dataio._iterfolder is not None:
         relpath = join(f"{dataio._realfolder}/{dataio._iterfolder}", relpath)
-    relpath = join(f"{relpath}/{filename.lower()}{ext}")
+    relpath = join(f"{relpath}/{filename}{ext}")
 
     logger.info("Full path to the actual file is: %s", abspath)
     logger.info("Full path to the metadata file (if used) is: %s", metapath)
@@ -166,45 +241,200 @@ def drop_nones(dinput: dict) -> dict:
     return dd
 
 
-def export_metadata_file(yfile, metadata, savefmt="yaml", verbosity="WARNING") -> None:
-    """Export genericly and ordered to the complementary metadata file."""
-    logger.setLevel(level=verbosity)
-    if metadata:
+@contextlib.contextmanager
+def open_file_atomic(fname, mode="w"):
+    """Open for writing a temporary file which replaces file fname when closed.
 
-        xdata = drop_nones(metadata)
+    Hence fname is never left half written, e.g. if the process is killed. The file
+    is written with a large buffer, and text is written as UTF-8.
+    """
+    tmpname = f"{fname}.{os.getpid()}.tmp"
+    encoding = None if "b" in mode else "utf-8"
+    try:
+        with open(
+            tmpname, mode, buffering=WRITE_BUFFERSIZE, encoding=encoding
+        ) as stream:
+            yield stream
+        os.replace(tmpname, fname)
+    except BaseException:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+
+def write_file_atomic(fname, data: bytes) -> None:
+    """Write data to file fname, which is never left half written."""
+    with open_file_atomic(fname, "wb") as stream:
+        stream.write(data)
+
+
+def _prepare_metadata(yfile, metadata, savefmt):
+    """Return file name (.yml or .json) and metadata without Nones, for export."""
+    if not metadata:
+        raise RuntimeError(
+            "Export of metadata was requested, but no metadata are present."
+        )
 
-        if savefmt == "yaml":
-            yamlblock = oyaml.safe_dump(xdata)
-            with open(yfile, "w") as stream:
-                stream.write(yamlblock)
-        else:
-            jfile = str(yfile).replace(".yml", ".json")
-            jsonblock = json.dumps(xdata, default=str, indent=2)
-            with open(jfile, "w") as stream:
-                stream.write(jsonblock)
+    fname = str(yfile) if savefmt == "yaml" else str(yfile).replace(".yml", ".json")
+    return fname, drop_nones(metadata)
 
+
+def _dump_metadata(xdata, stream, savefmt):
+    """Serialize metadata directly to a (text) stream."""
+    if savefmt == "yaml":
+        oyaml.dump(xdata, stream, Dumper=oyaml.FastSafeDumper)
     else:
+        json.dump(xdata, stream, default=str, indent=2)
+
+
+def serialize_metadata(yfile, metadata, savefmt="yaml"):
+    """Return file name and (encoded) content of the complementary metadata file.
+
+    The file name is yfile, or for JSON the yfile with .yml replaced by .json
+    """
+    fname, xdata = _prepare_metadata(yfile, metadata, savefmt)
+    stream = io.StringIO()
+    _dump_metadata(xdata, stream, savefmt)
+    return fname, stream.getvalue().encode("utf-8")
+
+
+def export_metadata_file(yfile, metadata, savefmt="yaml") -> None:
+    """Export genericly and ordered to the complementary metadata file."""
+    fname, xdata = _prepare_metadata(yfile, metadata, savefmt)
+    with open_file_atomic(fname) as stream:
+        _dump_metadata(xdata, stream, savefmt)
+    logger.info("Yaml file on: %s", yfile)
+
+
+def export_metadata_archive(archive, blocks: dict) -> None:
+    """Export many metadata files to one (uncompressed) zip archive.
+
+    Writing one archive is much cheaper than many small files on e.g. NFS.
+
+    Args:
+        archive: Path to the zip archive.
+        blocks: Content (bytes) of the metadata files, per file name. The file
+            names are stored relative to the folder of the archive.
+    """
+    if not blocks:
         raise RuntimeError(
-            "Export of metadata was requested, but no metadata are present."
+            "Export of metadata archive was requested, but no metadata are present."
         )
-    logger.info("Yaml file on: %s", yfile)
+
+    folder = Path(archive).parent
+    folder.mkdir(parents=True, exist_ok=True)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED, allowZip64=True) as zfile:
+        for fname, block in blocks.items():
+            zfile.writestr(os.path.relpath(fname, folder), block)
+
+    write_file_atomic(archive, buffer.getvalue())
+    logger.info("Metadata archive on: %s", archive)
+
+
+def yaml_load(fname):
+    """Load a YAML (or JSON) file, and reuse the result while the file is unchanged.
+
+    A copy is returned, so the caller may modify the result.
+    """
+    fstat = os.stat(fname)
+    data = _yaml_load_cached(str(fname), fstat.st_ino, fstat.st_mtime_ns, fstat.st_size)
+    return copy.deepcopy(data)
+
+
+@functools.lru_cache(maxsize=8)
+def _yaml_load_cached(fname, inode, mtime_ns, size):
+    """Load YAML file; inode, mtime_ns and size are arguments to detect changes."""
+    with open(fname, "rb") as stream:
+        return oyaml.load(stream, Loader=oyaml.FastSafeLoader)
 
 
 def md5sum(fname):
-    hash_md5 = hashlib.md5()
+    """Return the md5 checksum (hex) of the content of file fname."""
+    with open(fname, "rb") as fil:
+        return _md5sum_stream(fil)
+
+
+def md5sum_and_size(fname):
+    """Return md5 checksum (hex) and size (bytes) of file fname, opening it once."""
     with open(fname, "rb") as fil:
-        for chunk in iter(lambda: fil.read(4096), b""):
-            hash_md5.update(chunk)
+        return _md5sum_stream(fil), os.fstat(fil.fileno()).st_size
+
+
+def _md5sum_stream(fil):
+    """Return the md5 checksum (hex) of the content of an open binary file."""
+    # the file is read once from start to end; let the kernel read ahead
+    _fadvise(fil, "POSIX_FADV_SEQUENTIAL")
+
+    if hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(fil, "md5").hexdigest()
+
+    # read into one reusable buffer, to avoid allocating a new chunk per read
+    hash_md5 = hashlib.md5()
+    buffer = bytearray(MD5_CHUNKSIZE)
+    view = memoryview(buffer)
+    nbytes = fil.readinto(buffer)
+    while nbytes:
+        hash_md5.update(view[:nbytes])
+        nbytes = fil.readinto(buffer)
     return hash_md5.hexdigest()
 
 
+def _fadvise(fil, advice):
+    """Advise the kernel on access to the open file fil, where supported (POSIX)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fil.fileno(), 0, 0, getattr(os, advice))
+    except OSError:
+        # e.g. not supported by the file system, and this is only a hint anyway
+        logger.debug("Could not set %s on %s", advice, fil.name)
+
+
+class HashingWriter(io.RawIOBase):
+    """Binary file writer that computes the md5 checksum and size of written bytes.
+
+    This avoids reading the file once more only to compute the checksum, and to
+    stat() it for the size. For text output (e.g. pandas to_csv), wrap it in
+    io.TextIOWrapper.
+    """
+
+    def __init__(self, fname):
+        super().__init__()
+        self._fil = open(fname, "wb")
+        self._hash_md5 = hashlib.md5()
+        self.size_bytes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        nbytes = self._fil.write(data)
+        self._hash_md5.update(data)
+        self.size_bytes += nbytes
+        return nbytes
+
+    def close(self):
+        if not self.closed:
+            self._fil.close()
+        super().close()
+
+    def hexdigest(self):
+        return self._hash_md5.hexdigest()
+
+
 def size(fname):
     return Path(fname).stat().st_size
 
 
 def uuid_from_string(string):
-    """Produce valid and repeteable UUID4 as a hash of given string"""
-    return uuid.UUID(hashlib.md5(string.encode("utf-8")).hexdigest())
+    """Produce valid and repeteable UUID4 as a hash of given string.
+
+    The md5 digest is kept (not a faster hash) so that uuids of existing
+    cases, iterations and realizations stay the same.
+    """
+    return uuid.UUID(bytes=hashlib.md5(string.encode("utf-8")).digest())
 
 
 def read_parameters_txt(pfile):
@@ -250,28 +480,21 @@ def read_parameters_txt(pfile):
 
     logger.debug("Reading parameters.txt from %s", pfile)
 
+    param = {}
     with open(pfile, "r") as stream:
-        buffer = stream.read().splitlines()
-
-    logger.debug("buffer is of type %s", type(buffer))
-    logger.debug("buffer has %s lines", str(len(buffer)))
-
-    buffer = [":".join(line.split()) for line in buffer]
-
-    param = OrderedDict()
-    for line in buffer:
-        items = line.split(":")
-        if len(items) == 2:
-            param[items[0]] = check_if_number(items[1])
-        elif len(items) == 3:
-            if items[0] not in param:
-                param[items[0]] = OrderedDict()
-
-            param[items[0]][items[1]] = check_if_number(items[2])
-        else:
-            raise RuntimeError(
-                f"Unexpected structure of parameters.txt, line is: {line}"
-            )
+        for line in stream:
+            items = _PARAMETER_SPLIT_RE.split(line.strip())
+            if len(items) == 2:
+                param[sys.intern(items[0])] = check_if_number(items[1])
+            elif len(items) == 3:
+                group = sys.intern(items[0])
+                if group not in param:
+                    param[group] = {}
+                param[group][sys.intern(items[1])] = check_if_number(items[2])
+            else:
+                raise RuntimeError(
+                    f"Unexpected structure of parameters.txt, line is: {line.strip()}"
+                )
 
     return param
 
@@ -279,16 +502,15 @@ def read_parameters_txt(pfile):
 def check_if_number(value):
     """Check if value (str) looks like a number and return the converted value."""
 
-    res = None
-    try:
-        res = int(value)
-    except ValueError:
-        try:
-            res = float(value)
-        except ValueError:
-            pass
-
-    if res is not None:
-        return res
+    # cheap string checks first; most values are either plain integers or floats
+    if value.isdecimal() or (value[:1] in ("-", "+") and value[1:].isdecimal()):
+        return int(value)
+
+    first = value[:1]
+    if first.isdecimal() or first in _FLOAT_START:
+        if "_" in value and _INT_RE.fullmatch(value):
+            return int(value)  # e.g. 1_000
+        if _FLOAT_RE.fullmatch(value):
+            return float(value)
 
     return value
@@ -34,8 +34,6 @@ import uuid
 from collections import OrderedDict
 from typing import Any, List, Optional, Union
 
-import yaml
-
 from . import _utils
 from ._export_item import _ExportItem
 
@@ -79,6 +77,7 @@ class ExportData:
     case_folder = "share/metadata"  # e.g. /some_rootpath/case/metadata
     createfolder = True
     meta_format = "yaml"
+    metadata_archive = None  # e.g. "metadata.zip", see write_metadata_archive()
 
     def __init__(
         self,
@@ -166,7 +165,15 @@ class ExportData:
         self._iterfolder = None
         self._realfolder = None
 
+        # resolved export folders, see _utils.verify_path()
+        self._folders = {}
+
+        # metadata per file name, collected when metadata_archive is set; kept after
+        # write_metadata_archive() so a rewritten archive holds all exports
+        self._metadata_archive_blocks = {}
+
         logger.setLevel(level=self._verbosity)
+        _utils.logger.setLevel(level=self._verbosity)
         self._pwd = pathlib.Path().absolute()
         logger.info("Create instance of ExportData")
         if runfolder:
@@ -405,8 +412,7 @@ class ExportData:
 
         logger.info("Read existing case metadata from %s", str(casemetafile))
 
-        with open(casemetafile, "r") as stream:
-            inmeta = yaml.safe_load(stream)  # will read json also?
+        inmeta = _utils.yaml_load(casemetafile)  # will read json also?
 
         c_meta = inmeta["fmu"]["case"]
 
@@ -433,9 +439,14 @@ class ExportData:
         r_meta["parameters"] = ertjob["params"]
 
         logger.info("Got metadata for fmu:realization")
-        logger.debug("Case meta: \n%s", json.dumps(c_meta, indent=2, default=str))
-        logger.debug("Iteration meta: \n%s", json.dumps(i_meta, indent=2, default=str))
-        logger.debug("Realiz. meta: \n%s", json.dumps(r_meta, indent=2, default=str))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Case meta: \n%s", json.dumps(c_meta, indent=2, default=str))
+            logger.debug(
+                "Iteration meta: \n%s", json.dumps(i_meta, indent=2, default=str)
+            )
+            logger.debug(
+                "Realiz. meta: \n%s", json.dumps(r_meta, indent=2, default=str)
+            )
 
         return c_meta, i_meta, r_meta
 
@@ -477,6 +488,9 @@ class ExportData:
         For HDF files the metadata may be stored on the _freeform_ block (yet to be
         resolved)).
 
+        If the class attribute ``metadata_archive`` is set, the metadata are instead
+        collected and later written to one archive, see write_metadata_archive().
+
         Args:
             obj: XTGeo instance or a Pandas Dataframe instance (more to be supported).
             subfolder: Optional subfolder below standard level to export to.
@@ -495,6 +509,34 @@ class ExportData:
         relpath = filepath.relative_to(self._pwd)
         return str(relpath)
 
+    def write_metadata_archive(self) -> str:
+        """Write all metadata collected by to_file() to one zip archive.
+
+        This is used when the class attribute ``metadata_archive`` is set to a file
+        name, e.g. "metadata.zip". Then to_file() does not write a metadata file per
+        exported file, but collects the metadata which are written here in one go.
+        This is much faster on network file systems when exporting many files.
+
+        The archive is placed in the export root, and the metadata files in it
+        have the same names and (relative) locations as they would have on disk::
+
+            maps/.top_volantis--depth.gri.yml
+
+        The collected metadata are kept on purpose after writing, so calling this
+        again (e.g. after more exports) rewrites the archive with all metadata
+        collected so far by this instance. Nothing is written unless this is called;
+        to_file() warns about that on the first collected metadata.
+
+        Returns:
+            String path (relative path) to the archive file.
+        """
+        if not self.metadata_archive:
+            raise ValueError("The metadata_archive is not set, no archive to write.")
+
+        archive = self._pwd / self.export_root / self.metadata_archive
+        _utils.export_metadata_archive(archive.resolve(), self._metadata_archive_blocks)
+        return str(archive.relative_to(self._pwd))
+
 
 # ######################################################################################
 # InitializeCase
@@ -522,6 +564,7 @@ class InitializeCase(ExportData):  # pylint: disable=too-few-public-methods
         self._case = True
 
         logger.setLevel(level=self._verbosity)
+        _utils.logger.setLevel(level=self._verbosity)
         self._pwd = pathlib.Path().absolute()
         logger.info("Create instance of InitializeCase")
 
@@ -577,8 +620,7 @@ class InitializeCase(ExportData):  # pylint: disable=too-few-public-methods
 
         if metafile.is_file():
             logger.debug("Case metadata file already exists. So parsing it.")
-            with open(metafile, "r") as stream:
-                existing_metadata = yaml.safe_load(stream)
+            existing_metadata = _utils.yaml_load(metafile)
 
         if existing_metadata is not None:
             logger.debug("Reusing fmu.case.uuid")
@@ -628,9 +670,7 @@ class InitializeCase(ExportData):  # pylint: disable=too-few-public-methods
         if not case_meta_exists:
             # collect needed metadata and save to disk
             logger.info("Create case metadata as %s", str(metafile))
-            _utils.export_metadata_file(
-                metafile, meta, verbosity=self._verbosity, savefmt=self.meta_format
-            )
+            _utils.export_metadata_file(metafile, meta, savefmt=self.meta_format)
 
         else:
             logger.warning(
@@ -698,7 +738,8 @@ class InitializeCase(ExportData):  # pylint: disable=too-few-public-methods
 
         casefolder = pathlib.Path(rootfolder) / pathlib.Path(self.case_folder)
 
-        logger.info("C_META is:\n%s", json.dumps(c_meta, indent=2))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("C_META is:\n%s", json.dumps(c_meta, indent=2))
         logger.info("case_folder:%s", casefolder)
 
         # write to file
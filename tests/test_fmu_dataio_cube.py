@@ -2,7 +2,6 @@
 import json
 import logging
 import shutil
-from collections import OrderedDict
 
 import fmu.dataio
 import xtgeo
@@ -12,7 +11,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-CFG = OrderedDict()
+CFG = {}
 CFG["template"] = {"name": "Test", "revision": "AUTO"}
 CFG["masterdata"] = {
     "smda": {
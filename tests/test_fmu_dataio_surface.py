@@ -4,6 +4,7 @@ import shutil
 import logging
 import pytest
 import json
+import zipfile
 import numpy as np
 import xtgeo
 import yaml
@@ -70,6 +71,69 @@ def test_surface_io_export_subfolder(tmp_path):
     assert (tmp_path / "maps" / "mysubfolder" / ".test.gri.yml").is_file() is True
 
 
+def test_surface_io_removed_folder(tmp_path, monkeypatch):
+    """Test that an export folder removed between exports is created again."""
+
+    srf = xtgeo.RegularSurface(
+        ncol=20, nrow=30, xinc=20, yinc=20, values=np.ma.ones((20, 30)), name="test"
+    )
+    fmu.dataio.ExportData.export_root = tmp_path.resolve()
+    fmu.dataio.ExportData.surface_fformat = "irap_binary"
+
+    exp = fmu.dataio.ExportData(content="depth")
+    exp._pwd = tmp_path
+    exp.to_file(srf)
+
+    shutil.rmtree(tmp_path / "maps")
+    exp.to_file(srf)
+
+    assert (tmp_path / "maps" / "test.gri").is_file() is True
+    assert (tmp_path / "maps" / ".test.gri.yml").is_file() is True
+
+    # without createfolder, the removed folder is reported and not created
+    shutil.rmtree(tmp_path / "maps")
+    monkeypatch.setattr(fmu.dataio.ExportData, "createfolder", False)
+    with pytest.raises(IOError, match="is not present"):
+        exp.to_file(srf)
+
+
+def test_surface_io_metadata_archive(tmp_path, monkeypatch):
+    """Test surface io where the metadata are exported to one archive."""
+
+    fmu.dataio.ExportData.export_root = tmp_path.resolve()
+    fmu.dataio.ExportData.surface_fformat = "irap_binary"
+    monkeypatch.setattr(fmu.dataio.ExportData, "metadata_archive", "metadata.zip")
+
+    exp = fmu.dataio.ExportData(content="depth")
+    exp._pwd = tmp_path
+    for name in ("top", "base"):
+        srf = xtgeo.RegularSurface(
+            ncol=20, nrow=30, xinc=20, yinc=20, values=np.ma.ones((20, 30)), name=name
+        )
+        if name == "top":
+            with pytest.warns(UserWarning, match="write_metadata_archive"):
+                exp.to_file(srf)
+        else:
+            exp.to_file(srf)
+
+    assert (tmp_path / "maps" / "top.gri").is_file() is True
+    assert (tmp_path / "maps" / ".top.gri.yml").is_file() is False
+
+    assert exp.write_metadata_archive() == "metadata.zip"
+    with zipfile.ZipFile(tmp_path / "metadata.zip") as zfile:
+        assert zfile.namelist() == ["maps/.top.gri.yml", "maps/.base.gri.yml"]
+        meta = yaml.safe_load(zfile.read("maps/.base.gri.yml"))
+
+    assert meta["data"]["name"] == "base"
+
+    # a rewritten archive still holds the metadata from earlier exports
+    srf.name = "mid"
+    exp.to_file(srf)
+    exp.write_metadata_archive()
+    with zipfile.ZipFile(tmp_path / "metadata.zip") as zfile:
+        assert len(zfile.namelist()) == 3
+
+
 def test_surface_io_larger_case(tmp_path):
     """Larger test surface io, uses global config from Drogon to tmp_path."""
 
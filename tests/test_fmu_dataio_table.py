@@ -6,6 +6,7 @@ import pandas as pd
 import yaml
 
 import fmu.dataio
+import fmu.dataio._utils as _utils
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -90,3 +91,23 @@ def test_tables_io_larger_case_ertrun(tmp_path):
 
     metadataout = out / ".sometable--what_descr.csv.yml"
     assert metadataout.is_file() is True
+
+
+def test_table_io_checksum(tmp_path):
+    """The md5 computed while writing the table shall match the file content."""
+
+    table = pd.DataFrame({"STOIIP": [123, 345, 654], "PORO": [0.2, 0.4, 0.3]})
+    fmu.dataio.ExportData.export_root = tmp_path.resolve()
+    fmu.dataio.ExportData.table_fformat = "csv"
+
+    exp = fmu.dataio.ExportData(name="test", content="volumes")
+    exp._pwd = tmp_path
+    exp.to_file(table)
+
+    with open(tmp_path / "tables" / ".test.csv.yml") as stream:
+        meta = yaml.safe_load(stream)
+
+    csvfile = tmp_path / "tables" / "test.csv"
+    assert meta["file"]["checksum_md5"] == _utils.md5sum(csvfile)
+    assert meta["file"]["size_bytes"] == csvfile.stat().st_size
+    assert pd.read_csv(csvfile).equals(table)
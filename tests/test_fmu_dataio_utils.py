@@ -1,5 +1,7 @@
 """Test the surface_io module."""
+import hashlib
 from collections import OrderedDict
+
 import pytest
 
 import fmu.dataio as fio
@@ -88,6 +90,15 @@ def test_utils_construct_filename(
     assert dest.resolve() == (tmp_path / expectedpath).resolve()
 
 
+def test_utils_construct_filename_invalid_name():
+    """Testing that name and tagname must be strings, while t1 and t2 may be not."""
+    with pytest.raises(AttributeError):
+        _utils.construct_filename(None, tagname="case1")
+
+    with pytest.raises(AttributeError):
+        _utils.construct_filename("some", tagname=5)
+
+
 def test_utils_verify_path():
     """Testing veriy the path."""
     ed = fio.ExportData(
@@ -114,6 +125,45 @@ def test_utils_verify_path():
     assert str(path).endswith("tmp/share/results/somefile.myext")
 
 
+def test_utils_verify_path_create_folder(tmp_path):
+    """Testing that missing folders are created, and remembered as verified."""
+    ed = fio.ExportData(config=CFG, content="depth", runfolder=tmp_path)
+
+    path, metapath, relpath, abspath = _utils.verify_path(
+        ed, "share/results/maps", "SomeFile", ".gri"
+    )
+
+    assert (tmp_path / "share" / "results" / "maps").is_dir()
+    assert abspath == (tmp_path / "share/results/maps/somefile.gri").resolve()
+    assert metapath == (tmp_path / "share/results/maps/.somefile.gri.yml").resolve()
+    assert relpath == "share/results/maps/somefile.gri"
+    assert ed._folders[(ed._pwd, "share/results/maps")] == abspath.parent
+
+
+def test_utils_build_paths(tmp_path):
+    """Testing that build_paths gives the same as construct_filename + verify_path"""
+    ed = fio.ExportData(config=CFG, content="depth", runfolder=tmp_path)
+
+    stem, dest = _utils.construct_filename(
+        "Some.Name", tagname="What Descr", t1=20200101, loc="grid", outroot="share"
+    )
+    expected = _utils.verify_path(ed, dest, stem, ".roff", dryrun=True)
+
+    res = _utils.build_paths(
+        ed,
+        "Some.Name",
+        ".roff",
+        tagname="What Descr",
+        t1=20200101,
+        loc="grid",
+        outroot="share",
+        dryrun=True,
+    )
+
+    assert res == expected
+    assert res[2] == "share/grids/some_name--what_descr--20200101.roff"
+
+
 def test_uuid_from_string():
     """Testing that uuid from string is repeatable"""
     string1 = "string1"
@@ -126,6 +176,9 @@ def test_uuid_from_string():
     assert uuid1 != uuid2
     assert uuidx == uuid1
 
+    # the uuids shall be stable across versions of fmu-dataio
+    assert str(uuid1) == "34b577be-20fb-c154-77aa-db9a08101ff9"
+
 
 def test_parse_parameters_txt():
     """Testing parsing of parameters.txt to JSON"""
@@ -148,3 +201,140 @@ def test_parse_parameters_txt_justified():
     assert res["SENSNAME"] == "rms_seed"
     assert res["GLOBVAR"]["VOLON_PERMH_CHANNEL"] == 1100
     assert res["LOG10_MULTREGT"]["MULT_VALYSAR_THERYS"] == -3.2582
+
+
+def test_md5sum(tmp_path):
+    """Testing that md5sum matches hashlib for files larger than one chunk"""
+    content = b"fmu-dataio" * (_utils.MD5_CHUNKSIZE // 5)
+    fname = tmp_path / "somefile.bin"
+    fname.write_bytes(content)
+
+    assert _utils.md5sum(fname) == hashlib.md5(content).hexdigest()
+
+
+def test_md5sum_chunked(tmp_path, monkeypatch):
+    """Testing md5sum when hashlib.file_digest is not present (Python < 3.11)"""
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    content = b"fmu-dataio" * (_utils.MD5_CHUNKSIZE // 5) + b"rest"
+    fname = tmp_path / "somefile.bin"
+    fname.write_bytes(content)
+
+    assert _utils.md5sum(fname) == hashlib.md5(content).hexdigest()
+
+
+def test_drop_nones():
+    """Testing that Nones are dropped in nested dicts, also inside lists"""
+    dinput = {
+        "a": None,
+        "b": {"c": None, "d": 1, "e": [{"f": None, "g": 2}, None, 3]},
+        "h": ({"i": None},),
+        "unchanged": {"x": [1, None], "y": {"z": 1}},
+    }
+
+    res = _utils.drop_nones(dinput)
+
+    assert res == {
+        "b": {"d": 1, "e": [{"g": 2}, None, 3]},
+        "h": ({},),
+        "unchanged": {"x": [1, None], "y": {"z": 1}},
+    }
+    assert dinput["a"] is None and dinput["b"]["c"] is None
+
+
+def test_export_metadata_file(tmp_path):
+    """Testing that metadata are exported in order and without Nones"""
+    meta = OrderedDict()
+    meta["zkey"] = {"b": 1, "a": None}
+    meta["akey"] = [OrderedDict([("y", "some"), ("x", 2.0)])]
+
+    yfile = tmp_path / ".somefile.gri.yml"
+    _utils.export_metadata_file(yfile, meta)
+
+    assert yfile.read_text() == "zkey:\n  b: 1\nakey:\n- y: some\n  x: 2.0\n"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1000", 1000),
+        ("-3", -3),
+        ("0.256355", 0.256355),
+        ("-3.21365", -3.21365),
+        ("1e-05", 1e-05),
+        (".5", 0.5),
+        ("+2", 2),
+        ("1E+5", 1e5),
+        ("-inf", float("-inf")),
+        ("1_000", 1000),
+        ("1_0.5", 10.5),
+        ("rms_seed", "rms_seed"),
+        ("p10_p90", "p10_p90"),
+        ("1.2.3", "1.2.3"),
+    ],
+)
+def test_check_if_number(value, expected):
+    """Testing conversion of strings that look like numbers"""
+    res = _utils.check_if_number(value)
+
+    assert res == expected
+    assert type(res) is type(expected)
+
+
+def test_parse_parameters_txt_columns(tmp_path):
+    """Testing that columns are separated by whitespace or colon"""
+    ptext = tmp_path / "parameters.txt"
+    ptext.write_text("RMS_SEED 1000\nGLOBVAR SOME 1\nGLOBVAR:OTHER 0.5\nKEY 12:30\n")
+
+    res = _utils.read_parameters_txt(ptext)
+
+    assert res == {
+        "RMS_SEED": 1000,
+        "GLOBVAR": {"SOME": 1, "OTHER": 0.5},
+        "KEY": {"12": 30},
+    }
+
+
+def test_parse_parameters_txt_invalid(tmp_path):
+    """Testing that unexpected lines in parameters.txt are reported"""
+    ptext = tmp_path / "parameters.txt"
+    ptext.write_text("SENSNAME rms_seed\nGLOBVAR:SOME:OTHER 1\n")
+
+    with pytest.raises(RuntimeError, match="GLOBVAR:SOME:OTHER"):
+        _utils.read_parameters_txt(ptext)
+
+
+def test_write_file_atomic(tmp_path):
+    """Testing that an existing file is replaced, and no temporary file is left"""
+    fname = tmp_path / "fmu_case.yml"
+    fname.write_text("some old content which is longer")
+
+    _utils.write_file_atomic(fname, b"new: content\n")
+
+    assert fname.read_bytes() == b"new: content\n"
+    assert list(tmp_path.iterdir()) == [fname]
+
+
+def test_yaml_load(tmp_path):
+    """Testing that yaml_load reuses the parsed file until it is changed"""
+    yfile = tmp_path / "fmu_case.yml"
+    _utils.write_file_atomic(yfile, b"fmu:\n  case:\n    uuid: abc\n")
+
+    first = _utils.yaml_load(yfile)
+    first["fmu"]["case"]["uuid"] = "modified by caller"
+    hits = _utils._yaml_load_cached.cache_info().hits
+    assert _utils.yaml_load(yfile) == {"fmu": {"case": {"uuid": "abc"}}}
+    assert _utils._yaml_load_cached.cache_info().hits == hits + 1
+
+    _utils.write_file_atomic(yfile, b"fmu:\n  case:\n    uuid: xyz\n")
+    assert _utils.yaml_load(yfile) == {"fmu": {"case": {"uuid": "xyz"}}}
+
+
+def test_md5sum_and_size(tmp_path):
+    """Testing that md5sum_and_size matches the HashingWriter for the same content"""
+    fname = tmp_path / "somefile.bin"
+    with _utils.HashingWriter(fname) as writer:
+        writer.write(b"some")
+        writer.write(b"content")
+
+    assert _utils.md5sum_and_size(fname) == (writer.hexdigest(), writer.size_bytes)
+    assert _utils.md5sum_and_size(fname) == (_utils.md5sum(fname), 11)